@@ -1,13 +1,21 @@
 using Evolvatron.Evolvion;
 using TinyWorlds;
 using System.Globalization;
+using System.Text.Json;
 
 // Optuna CLI Evaluation Tool
 // Usage: dotnet run -- <param1>=<value1> <param2>=<value2> ...
 // Output: Single line with final best fitness (more negative = better for MSE loss)
+//
+// Worker mode: dotnet run -- --serve
+// Reads one JSON object of parameters per stdin line and writes "RESULT <fitness>" per request,
+// so a sweep can keep a single warm process alive instead of paying startup/JIT per trial.
+// Each seed's result is streamed first as "SEED <index> <fitness>" so the sweep can prune early.
+// The prefixes let the sweep skip any other console output without buffering it.
 
 // Parse command-line arguments into dictionary
 var cmdArgs = Environment.GetCommandLineArgs().Skip(1).ToArray();
+bool serve = cmdArgs.Contains("--serve");
 var parameters = new Dictionary<string, string>(StringComparer.OrdinalIgnoreCase);
 
 foreach (var arg in cmdArgs)
@@ -42,7 +50,7 @@ T GetParam<T>(string name, T defaultValue)
 }
 
 // Build EvolutionConfig from parameters
-var config = new EvolutionConfig
+EvolutionConfig BuildConfig() => new EvolutionConfig
 {
     // Population structure
     SpeciesCount = GetParam("species_count", 20),
@@ -98,40 +106,71 @@ const int seed = 42;
 const int generations = 150;
 const int numSeeds = 3; // Run multiple seeds for robustness
 
-var results = new List<float>();
+if (serve)
+{
+    string? line;
+    while ((line = Console.ReadLine()) != null)
+    {
+        if (string.IsNullOrWhiteSpace(line))
+            continue;
+
+        parameters.Clear();
+        using var request = JsonDocument.Parse(line);
+        foreach (var property in request.RootElement.EnumerateObject())
+        {
+            parameters[property.Name] = property.Value.ValueKind == JsonValueKind.String
+                ? property.Value.GetString()!
+                : property.Value.GetRawText();
+        }
+
+        Console.WriteLine($"RESULT {Evaluate().ToString("F6", CultureInfo.InvariantCulture)}");
+    }
+}
+else
+{
+    Console.WriteLine(Evaluate().ToString("F6", CultureInfo.InvariantCulture));
+}
 
-for (int s = 0; s < numSeeds; s++)
+float Evaluate()
 {
-    var evolver = new Evolver(seed + s);
-    var random = new Random(seed + s);
-
-    // Create spiral classification topology (2→8→8→1)
-    var topology = new SpeciesBuilder()
-        .AddInputRow(2)
-        .AddHiddenRow(8, ActivationType.ReLU, ActivationType.Tanh, ActivationType.Sigmoid, ActivationType.LeakyReLU)
-        .AddHiddenRow(8, ActivationType.ReLU, ActivationType.Tanh, ActivationType.LeakyReLU)
-        .AddOutputRow(1, ActivationType.Tanh)
-        .WithMaxInDegree(10)
-        .InitializeDense(random, density: 0.3f)
-        .Build();
-
-    var population = evolver.InitializePopulation(config, topology);
-    var environment = new SpiralEnvironment(pointsPerSpiral: 50, noise: 0.0f);
-    var evaluator = new SimpleFitnessEvaluator();
-
-    // Evolve
-    for (int gen = 0; gen < generations; gen++)
+    var config = BuildConfig();
+    var results = new List<float>();
+
+    for (int s = 0; s < numSeeds; s++)
     {
-        evaluator.EvaluatePopulation(population, environment, seed: gen + s);
-        evolver.StepGeneration(population);
+        var evolver = new Evolver(seed + s);
+        var random = new Random(seed + s);
+
+        // Create spiral classification topology (2→8→8→1)
+        var topology = new SpeciesBuilder()
+            .AddInputRow(2)
+            .AddHiddenRow(8, ActivationType.ReLU, ActivationType.Tanh, ActivationType.Sigmoid, ActivationType.LeakyReLU)
+            .AddHiddenRow(8, ActivationType.ReLU, ActivationType.Tanh, ActivationType.LeakyReLU)
+            .AddOutputRow(1, ActivationType.Tanh)
+            .WithMaxInDegree(10)
+            .InitializeDense(random, density: 0.3f)
+            .Build();
+
+        var population = evolver.InitializePopulation(config, topology);
+        var environment = new SpiralEnvironment(pointsPerSpiral: 50, noise: 0.0f);
+        var evaluator = new SimpleFitnessEvaluator();
+
+        // Evolve
+        for (int gen = 0; gen < generations; gen++)
+        {
+            evaluator.EvaluatePopulation(population, environment, seed: gen + s);
+            evolver.StepGeneration(population);
+        }
+
+        // Final evaluation
+        evaluator.EvaluatePopulation(population, environment, seed: generations + s);
+        var finalStats = population.GetStatistics();
+        results.Add(finalStats.BestFitness);
+
+        if (serve)
+            Console.WriteLine($"SEED {s} {finalStats.BestFitness.ToString("F6", CultureInfo.InvariantCulture)}");
     }
 
-    // Final evaluation
-    evaluator.EvaluatePopulation(population, environment, seed: generations + s);
-    var finalStats = population.GetStatistics();
-    results.Add(finalStats.BestFitness);
+    // Output: mean fitness across seeds (negative MSE - more negative = worse)
+    return results.Average();
 }
-
-// Output: mean fitness across seeds (negative MSE - more negative = worse)
-float meanFitness = results.Average();
-Console.WriteLine(meanFitness.ToString("F6", CultureInfo.InvariantCulture));
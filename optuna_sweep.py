@@ -3,126 +3,331 @@
 Optuna Hyperparameter Optimization for Evolvion
 Runs Bayesian optimization using TPE sampler to find optimal hyperparameters.
 
+The C# evaluator is published once to _pub/ (skip with --no-publish), run with
+dotnet exec and kept running as a warm worker (--serve mode), receiving one
+JSON parameter set per trial over stdin.
+
 Usage:
     python optuna_sweep.py --n-trials 100 --storage sqlite:///optuna_evolvion.db --study-name evolvion_sweep_v1
 
+    # Many parallel workers: use a server database so trials don't queue on SQLite's file lock
+    python optuna_sweep.py --n-jobs 8 --storage postgresql+psycopg://user:pw@host/optuna
+
+    # Follow progress without polling the study database
+    tail -f optuna_progress.jsonl
+
 Dependencies:
     pip install optuna
+    pip install psycopg       # only for postgresql+psycopg:// storage
 """
 
 import argparse
+import hashlib
+import json
+import math
+import os
+import signal
+import sqlite3
 import subprocess
 import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from heapq import nlargest
+from operator import attrgetter
 from pathlib import Path
 
 try:
     import optuna
+    from optuna.trial import TrialState
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+    from tqdm import tqdm
 except ImportError:
     print("ERROR: optuna not installed. Install with: pip install optuna")
     sys.exit(1)
 
 
-def objective(trial):
+PROJECT = "Evolvatron.OptunaEval/Evolvatron.OptunaEval.csproj"
+EVALUATOR_DLL = "Evolvatron.OptunaEval.dll"
+EVAL_TIMEOUT = 600  # 10 minute timeout per evaluation (3 seeds × 150 gens each)
+NUM_SEEDS = 3  # Seeds per evaluation, streamed back one at a time for pruning
+MIN_POPULATION = 4 * 20  # Smallest species_count x individuals_per_species in the search space
+
+
+@event.listens_for(Engine, "connect")
+def _tune_sqlite(dbapi_connection, connection_record):
+    """
+    SQLite defaults to a rollback journal with a full fsync per commit, and RDBStorage
+    commits on every suggest/report. WAL + synchronous=NORMAL only syncs at checkpoints
+    and lets readers (dashboard, other jobs) proceed while a trial is being written.
+    """
+    if not isinstance(dbapi_connection, sqlite3.Connection):
+        return
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.close()
+
+
+def create_storage(url, pool_size=1):
     """
-    Optuna objective function.
-    Runs the C# CLI tool with sampled hyperparameters and returns fitness.
+    Builds RDBStorage. SQLite connections wait on locks instead of failing immediately;
+    server databases (PostgreSQL/MySQL) get a pool sized for the process's concurrent
+    evaluator threads, with liveness checks for connections idle through long trials.
+    """
+    engine_kwargs = {}
+    if url.startswith("sqlite"):
+        engine_kwargs["connect_args"] = {"timeout": 30}
+    else:
+        engine_kwargs["pool_size"] = pool_size
+        engine_kwargs["pool_pre_ping"] = True
+    return optuna.storages.RDBStorage(url, engine_kwargs=engine_kwargs)
+
+
+class EvaluatorWorker:
+    """
+    Long-lived Evolvatron.OptunaEval process running in --serve mode.
+    Each evaluation writes one JSON line of parameters to stdin and reads back a
+    "RESULT <fitness>" line from stdout, so startup and JIT warmup are paid once per
+    study rather than once per trial. A watchdog timer kills the process if an
+    evaluation exceeds the timeout; the next evaluation starts a fresh process.
+
+    Per-seed "SEED <index> <fitness>" lines arriving before the result are passed to
+    on_seed; if it returns True the in-flight evaluation is abandoned (process killed)
+    and the trial pruned. Any other output is treated as log noise and skipped.
+    """
+
+    def __init__(self, dll_path, timeout=EVAL_TIMEOUT):
+        # dotnet exec runs the published assembly directly - no project evaluation or build check
+        self.command = ["dotnet", "exec", str(dll_path), "--serve"]
+        self.timeout = timeout
+        self.proc = None
+        self.timed_out = False
+
+    def start(self):
+        self.proc = subprocess.Popen(
+            self.command,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            text=True,
+            bufsize=1
+        )
+
+    def evaluate(self, params, on_seed=None):
+        """Returns the fitness string from the RESULT line for one parameter set."""
+        if self.proc is None or self.proc.poll() is not None:
+            self.start()
+
+        result = None
+        last_line = ""
+        self.timed_out = False
+        watchdog = threading.Timer(self.timeout, self._kill_on_timeout, args=(self.proc,))
+        watchdog.start()
+        try:
+            self.proc.stdin.write(json.dumps(params) + "\n")
+            self.proc.stdin.flush()
+            # Stream the reply; only the latest stray line is kept, never the whole log
+            for line in self.proc.stdout:
+                if line.startswith("RESULT "):
+                    result = line[len("RESULT "):].strip()
+                    break
+                if line.startswith("SEED "):
+                    _, seed_index, seed_fitness = line.split()
+                    if on_seed is not None and on_seed(int(seed_index), float(seed_fitness)):
+                        raise optuna.TrialPruned()
+                    continue
+                last_line = line
+        except OSError:
+            pass
+        except BaseException:
+            # Reply abandoned midway (pruned, malformed SEED line, report failure): the rest of
+            # it would be read by the next trial, so discard the process before propagating
+            self._discard()
+            raise
+        finally:
+            watchdog.cancel()
+
+        if result is None:
+            # Worker died (watchdog kill or crash) - drop it so the next call restarts it
+            returncode = self._discard()
+            if self.timed_out:
+                raise subprocess.TimeoutExpired(self.command, self.timeout, output=last_line)
+            raise subprocess.CalledProcessError(returncode, self.command, output=last_line)
+
+        return result
+
+    def _discard(self):
+        """Kills the process (if still running) and forgets it; returns its exit code."""
+        self.proc.kill()
+        returncode = self.proc.wait()
+        self.proc = None
+        return returncode
+
+    def _kill_on_timeout(self, proc):
+        self.timed_out = True
+        proc.kill()
+
+    def kill(self):
+        """Kills the process from another thread, ending any evaluation in flight."""
+        proc = self.proc
+        if proc is not None:
+            proc.kill()
+
+    def close(self):
+        if self.proc is None:
+            return
+        try:
+            self.proc.stdin.close()
+            self.proc.wait(timeout=10)
+        except (OSError, subprocess.TimeoutExpired):
+            self.proc.kill()
+        self.proc = None
+
+
+def params_hash(params):
+    """Stable digest of a parameter set, used to recognize repeated suggestions."""
+    return hashlib.blake2b(json.dumps(params, sort_keys=True).encode(), digest_size=16).hexdigest()
+
+
+def sample_params(trial, max_population=None):
+    """
+    Samples one hyperparameter set from the search space. With max_population the
+    population ranges are narrowed so species_count x individuals_per_species never
+    exceeds it.
 
     Returns:
-        float: Mean fitness across 3 seeds (negative MSE - we want to MAXIMIZE this = minimize loss)
+        dict: Parameter name -> value, as sent to the C# evaluator
     """
+    params = {}
 
     # Population structure (NEAT-style vs traditional tradeoff)
-    species_count = trial.suggest_int("species_count", 4, 30)
-    individuals_per_species = trial.suggest_int("individuals_per_species", 20, 100)
+    # Evaluation cost scales with total population, so a budget caps both ranges
+    max_species = 30 if max_population is None else min(30, max_population // 20)
+    params["species_count"] = trial.suggest_int("species_count", 4, max_species)
+    max_individuals = 100 if max_population is None else min(100, max_population // params["species_count"])
+    params["individuals_per_species"] = trial.suggest_int("individuals_per_species", 20, max_individuals)
     # Keep total population ~800 by suggesting complementary values
     # (Optuna will explore deviations naturally)
 
-    min_species_count = trial.suggest_int("min_species_count", 2, max(2, species_count // 3))
+    params["min_species_count"] = trial.suggest_int("min_species_count", 2, max(2, params["species_count"] // 3))
 
     # Selection pressure
-    elites = trial.suggest_int("elites", 1, 4)
-    tournament_size = trial.suggest_int("tournament_size", 4, 32)
-    parent_pool_percentage = trial.suggest_float("parent_pool_percentage", 0.5, 1.0)
+    params["elites"] = trial.suggest_int("elites", 1, 4)
+    params["tournament_size"] = trial.suggest_int("tournament_size", 4, 32)
+    params["parent_pool_percentage"] = trial.suggest_float("parent_pool_percentage", 0.5, 1.0)
 
     # Culling thresholds (NEW - Phase 10)
-    grace_generations = trial.suggest_int("grace_generations", 0, 3)
-    stagnation_threshold = trial.suggest_int("stagnation_threshold", 3, 15)
-    species_diversity_threshold = trial.suggest_float("species_diversity_threshold", 0.01, 0.20)
-    relative_performance_threshold = trial.suggest_float("relative_performance_threshold", 0.3, 0.9)
+    params["grace_generations"] = trial.suggest_int("grace_generations", 0, 3)
+    params["stagnation_threshold"] = trial.suggest_int("stagnation_threshold", 3, 15)
+    params["species_diversity_threshold"] = trial.suggest_float("species_diversity_threshold", 0.01, 0.20)
+    params["relative_performance_threshold"] = trial.suggest_float("relative_performance_threshold", 0.3, 0.9)
 
     # Weight mutations (Phase 7 + Phase 9 findings)
-    weight_jitter = trial.suggest_float("weight_jitter", 0.8, 1.0)
-    weight_jitter_stddev = trial.suggest_float("weight_jitter_stddev", 0.1, 0.5)
-    weight_reset = trial.suggest_float("weight_reset", 0.0, 0.2)
-    weight_l1_shrink = trial.suggest_float("weight_l1_shrink", 0.0, 0.4)
-    l1_shrink_factor = trial.suggest_float("l1_shrink_factor", 0.85, 0.95)
-    activation_swap = trial.suggest_float("activation_swap", 0.0, 0.20)
+    params["weight_jitter"] = trial.suggest_float("weight_jitter", 0.8, 1.0)
+    params["weight_jitter_stddev"] = trial.suggest_float("weight_jitter_stddev", 0.1, 0.5)
+    params["weight_reset"] = trial.suggest_float("weight_reset", 0.0, 0.2)
+    params["weight_l1_shrink"] = trial.suggest_float("weight_l1_shrink", 0.0, 0.4)
+    params["l1_shrink_factor"] = trial.suggest_float("l1_shrink_factor", 0.85, 0.95)
+    params["activation_swap"] = trial.suggest_float("activation_swap", 0.0, 0.20)
 
     # Node parameter mutation (Phase 7: disabled was best, but allow Optuna to verify)
-    node_param_mutate = trial.suggest_float("node_param_mutate", 0.0, 0.1)
-    node_param_stddev = trial.suggest_float("node_param_stddev", 0.05, 0.2)
+    params["node_param_mutate"] = trial.suggest_float("node_param_mutate", 0.0, 0.1)
+    params["node_param_stddev"] = trial.suggest_float("node_param_stddev", 0.05, 0.2)
 
     # Topology mutations
-    edge_add = trial.suggest_float("edge_add", 0.0, 0.15)
-    edge_delete_random = trial.suggest_float("edge_delete_random", 0.0, 0.05)
-    edge_split = trial.suggest_float("edge_split", 0.0, 0.05)
-    edge_redirect = trial.suggest_float("edge_redirect", 0.0, 0.10)
-    edge_swap = trial.suggest_float("edge_swap", 0.0, 0.05)
+    params["edge_add"] = trial.suggest_float("edge_add", 0.0, 0.15)
+    params["edge_delete_random"] = trial.suggest_float("edge_delete_random", 0.0, 0.05)
+    params["edge_split"] = trial.suggest_float("edge_split", 0.0, 0.05)
+    params["edge_redirect"] = trial.suggest_float("edge_redirect", 0.0, 0.10)
+    params["edge_swap"] = trial.suggest_float("edge_swap", 0.0, 0.05)
 
     # Weak edge pruning
-    weak_edge_pruning_enabled = trial.suggest_categorical("weak_edge_pruning_enabled", [True, False])
-    weak_edge_pruning_threshold = trial.suggest_float("weak_edge_pruning_threshold", 0.001, 0.05)
-    weak_edge_pruning_base_rate = trial.suggest_float("weak_edge_pruning_base_rate", 0.5, 0.9)
-    weak_edge_pruning_on_birth = trial.suggest_categorical("weak_edge_pruning_on_birth", [True, False])
-    weak_edge_pruning_during_evolution = trial.suggest_categorical("weak_edge_pruning_during_evolution", [True, False])
-
-    # Build command-line arguments
-    args = [
-        "dotnet", "run", "--project", "Evolvatron.OptunaEval/Evolvatron.OptunaEval.csproj",
-        "-c", "Release", "--",
-        f"species_count={species_count}",
-        f"individuals_per_species={individuals_per_species}",
-        f"min_species_count={min_species_count}",
-        f"elites={elites}",
-        f"tournament_size={tournament_size}",
-        f"parent_pool_percentage={parent_pool_percentage}",
-        f"grace_generations={grace_generations}",
-        f"stagnation_threshold={stagnation_threshold}",
-        f"species_diversity_threshold={species_diversity_threshold}",
-        f"relative_performance_threshold={relative_performance_threshold}",
-        f"weight_jitter={weight_jitter}",
-        f"weight_jitter_stddev={weight_jitter_stddev}",
-        f"weight_reset={weight_reset}",
-        f"weight_l1_shrink={weight_l1_shrink}",
-        f"l1_shrink_factor={l1_shrink_factor}",
-        f"activation_swap={activation_swap}",
-        f"node_param_mutate={node_param_mutate}",
-        f"node_param_stddev={node_param_stddev}",
-        f"edge_add={edge_add}",
-        f"edge_delete_random={edge_delete_random}",
-        f"edge_split={edge_split}",
-        f"edge_redirect={edge_redirect}",
-        f"edge_swap={edge_swap}",
-        f"weak_edge_pruning_enabled={str(weak_edge_pruning_enabled).lower()}",
-        f"weak_edge_pruning_threshold={weak_edge_pruning_threshold}",
-        f"weak_edge_pruning_base_rate={weak_edge_pruning_base_rate}",
-        f"weak_edge_pruning_on_birth={str(weak_edge_pruning_on_birth).lower()}",
-        f"weak_edge_pruning_during_evolution={str(weak_edge_pruning_during_evolution).lower()}",
-    ]
-
-    # Run evaluation
+    params["weak_edge_pruning_enabled"] = trial.suggest_categorical("weak_edge_pruning_enabled", [True, False])
+
+    # The evaluator ignores the other pruning settings when pruning is disabled, so only
+    # sample them when active - keeps dead dimensions out of the TPE model
+    if params["weak_edge_pruning_enabled"]:
+        params["weak_edge_pruning_threshold"] = trial.suggest_float("weak_edge_pruning_threshold", 0.001, 0.05)
+        params["weak_edge_pruning_base_rate"] = trial.suggest_float("weak_edge_pruning_base_rate", 0.5, 0.9)
+        params["weak_edge_pruning_on_birth"] = trial.suggest_categorical("weak_edge_pruning_on_birth", [True, False])
+        params["weak_edge_pruning_during_evolution"] = trial.suggest_categorical(
+            "weak_edge_pruning_during_evolution", [True, False])
+
+    return params
+
+
+def parse_param_value(value):
+    """Restores a saved parameter string to bool/int/float."""
+    if value in ("True", "False"):
+        return value == "True"
     try:
-        result = subprocess.run(
-            args,
-            capture_output=True,
-            text=True,
-            timeout=600,  # 10 minute timeout per evaluation (3 seeds × 150 gens each)
-            check=True
-        )
+        return int(value)
+    except ValueError:
+        return float(value)
+
+
+def load_params_file(path, k=5):
+    """
+    Reads warm-start hyperparameters from either results file the sweep writes:
+    the tab-separated optuna_top_trials.txt (up to the first k rows, blank cells =
+    params the trial didn't sample) or the "key=value" optuna_best_params.txt
+    (a single set; header lines without '=' are skipped).
+
+    Returns:
+        list: Parameter dicts, best first
+
+    Raises:
+        ValueError: If the file contains no parameters
+    """
+    lines = Path(path).read_text().splitlines()
+
+    if lines and lines[0].startswith("trial\tfitness\t"):
+        names = lines[0].split("\t")[2:]
+        param_sets = []
+        for line in lines[1:k + 1]:
+            cells = line.split("\t")[2:]
+            param_sets.append({
+                name: parse_param_value(cell) for name, cell in zip(names, cells) if cell
+            })
+    else:
+        params = {}
+        for line in lines:
+            if "=" not in line:
+                continue
+            key, value = (part.strip() for part in line.split("=", 1))
+            params[key] = parse_param_value(value)
+        param_sets = [params]
+
+    param_sets = [params for params in param_sets if params]
+    if not param_sets:
+        raise ValueError(f"no hyperparameters found in {path}")
+    return param_sets
+
+
+def evaluate(trial, params, worker):
+    """
+    Sends sampled hyperparameters to a warm C# evaluator worker and returns fitness.
+    The running mean after each seed is reported to the pruner; raises TrialPruned
+    if the trial is stopped early.
 
-        # Parse output (single line with fitness value)
-        fitness_str = result.stdout.strip().split('\n')[-1]
-        fitness = float(fitness_str)
+    Returns:
+        float: Mean fitness across 3 seeds (negative MSE - we want to MAXIMIZE this = minimize loss)
+    """
+    seed_fitnesses = []
+
+    def report_seed(seed_index, seed_fitness):
+        seed_fitnesses.append(seed_fitness)
+        # Step = seeds completed, so the pruner's first rung (min_resource=1) follows seed 0
+        trial.report(sum(seed_fitnesses) / len(seed_fitnesses), seed_index + 1)
+        # After the last seed the evaluation is already paid for - keep the result
+        return seed_index + 1 < NUM_SEEDS and trial.should_prune()
+
+    output = None  # Stays None if the ValueError comes from a malformed SEED line
+    try:
+        output = worker.evaluate(params, on_seed=report_seed)
+        fitness = float(output)
 
         # Report intermediate values for monitoring
         trial.set_user_attr("fitness", fitness)
@@ -134,70 +339,353 @@ def objective(trial):
         return float('-inf')  # Worst possible fitness
     except subprocess.CalledProcessError as e:
         print(f"Trial {trial.number} failed with error: {e}")
-        print(f"Stderr: {e.stderr}")
+        if e.output:
+            print(f"Last output: {e.output.strip()}")
         return float('-inf')
     except ValueError as e:
         print(f"Trial {trial.number} failed to parse fitness: {e}")
-        print(f"Output: {result.stdout}")
+        if output is not None:
+            print(f"Output: {output}")
         return float('-inf')
 
 
+def create_sampler(seed, n_startup_trials=20):
+    # multivariate/group: model correlated params (e.g. weight_jitter + stddev) jointly,
+    #   with conditional params getting their own group
+    # constant_liar: treat running trials as bad so parallel workers don't resample the same region
+    return optuna.samplers.TPESampler(
+        seed=seed,
+        n_startup_trials=n_startup_trials,
+        multivariate=True,
+        group=True,
+        constant_liar=True
+    )
+
+
+def create_pruner():
+    # One resource unit = one completed evaluation seed (steps 1..NUM_SEEDS), so the
+    # first rung checks hopeless trials right after their first seed
+    return optuna.pruners.HyperbandPruner(min_resource=1, max_resource=NUM_SEEDS)
+
+
+def pin_to_cpus(worker_id, n_workers):
+    """
+    Restricts this process (and the evaluators it spawns, which inherit the mask) to a
+    contiguous, disjoint block of the available CPUs so parallel workers don't thrash
+    each other's caches. .NET sizes its thread pool from the affinity mask.
+
+    Returns:
+        list: CPUs this worker is pinned to (empty if pinning isn't possible or there
+        are more workers than CPUs)
+    """
+    if hasattr(os, "sched_getaffinity"):
+        cpus = sorted(os.sched_getaffinity(0))
+    else:
+        cpus = list(range(os.cpu_count() or 1))
+
+    # Fewer CPUs than workers: blocks can't be disjoint, so leave every worker unpinned
+    if n_workers > len(cpus):
+        return []
+    mine = cpus[worker_id * len(cpus) // n_workers:(worker_id + 1) * len(cpus) // n_workers]
+
+    if hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, mine)
+    elif sys.platform == "win32":
+        import ctypes
+        kernel32 = ctypes.windll.kernel32
+        mask = sum(1 << cpu for cpu in mine)
+        if not kernel32.SetProcessAffinityMask(kernel32.GetCurrentProcess(), ctypes.c_size_t(mask)):
+            return []
+    else:
+        return []
+    return mine
+
+
+def run_worker(args):
+    """
+    Worker process: loads the shared study and runs ask-and-tell batches of --batch-size
+    trials until it has finished its --worker-trials share of the run.
+    A batch is sampled up front, evaluated concurrently on the worker's warm evaluators,
+    then told back to the study. Parameter sets matching an already completed trial
+    (same params_hash) reuse its fitness instead of being evaluated again.
+    """
+    if args.worker and args.pin_cpus:
+        cpus = pin_to_cpus(args.worker_id, args.n_jobs)
+        if cpus:
+            print(f"Worker {args.worker_id} pinned to CPUs {cpus}")
+
+    study = optuna.load_study(
+        study_name=args.study_name,
+        # Evaluator threads report/prune concurrently alongside the ask/tell thread
+        storage=create_storage(args.storage, pool_size=args.batch_size + 1),
+        # Distinct seeds so workers don't propose identical startup trials
+        sampler=create_sampler(42 + args.worker_id, args.n_startup_trials),
+        pruner=create_pruner()
+    )
+
+    # Appended to by every worker; line buffering makes each record a single small append
+    progress = open(args.progress_file, "a", buffering=1) if args.progress_file else None
+
+    told = 0
+    pending = {}  # Asked but not yet told, by trial number
+    # Same bar study.optimize(show_progress_bar=True) gave; spawned workers stay quiet
+    bar = tqdm(total=args.worker_trials, disable=args.worker)
+
+    def tell(trial, value=None, state=TrialState.COMPLETE):
+        nonlocal told
+        study.tell(trial, value, state=state)
+        pending.pop(trial.number, None)
+        told += 1
+        bar.update()
+        if progress is not None:
+            progress.write(json.dumps({
+                "n": trial.number,
+                "state": state.name,
+                "v": value if value is not None and math.isfinite(value) else None,
+                "ts": time.time(),
+                "worker": args.worker_id,
+            }) + "\n")
+
+    dll_path = Path(args.publish_dir) / EVALUATOR_DLL
+    workers = [EvaluatorWorker(dll_path) for _ in range(args.batch_size)]
+    pool = ThreadPoolExecutor(max_workers=len(workers))
+    try:
+        while told < args.worker_trials:
+            batch_size = min(len(workers), args.worker_trials - told)
+
+            # Fitness of every parameter set already evaluated, so repeats skip the evaluator
+            known = {}
+            for t in study.get_trials(deepcopy=False, states=(TrialState.COMPLETE,)):
+                if "params_hash" in t.user_attrs and math.isfinite(t.value):
+                    known.setdefault(t.user_attrs["params_hash"], t)
+
+            batch = []
+            for _ in range(batch_size):
+                trial = study.ask()
+                pending[trial.number] = trial
+                params = sample_params(trial, args.max_population)
+                digest = params_hash(params)
+                trial.set_user_attr("params_hash", digest)
+
+                previous = known.get(digest)
+                if previous is not None:
+                    print(f"Trial {trial.number} repeats trial {previous.number}, reusing its fitness")
+                    trial.set_user_attr("fitness", previous.value)
+                    trial.set_user_attr("reused_from", previous.number)
+                    tell(trial, previous.value)
+                else:
+                    batch.append((trial, params))
+
+            futures = [
+                pool.submit(evaluate, trial, params, worker)
+                for (trial, params), worker in zip(batch, workers)
+            ]
+            # Settle every trial in the batch before surfacing an error, so none is left
+            # RUNNING in the shared study (constant_liar would keep sampling around it)
+            error = None
+            for (trial, _), future in zip(batch, futures):
+                try:
+                    tell(trial, future.result())
+                except optuna.TrialPruned:
+                    tell(trial, state=TrialState.PRUNED)
+                except Exception as e:
+                    tell(trial, state=TrialState.FAIL)
+                    error = error or e
+            if error is not None:
+                raise error
+    finally:
+        if pending:
+            # Interrupted mid-batch (Ctrl-C, SIGTERM, error while asking): kill the evaluators so
+            # their threads return, then fail the untold trials so none stays RUNNING forever
+            for worker in workers:
+                worker.kill()
+            pool.shutdown(cancel_futures=True)
+            for trial in list(pending.values()):
+                tell(trial, state=TrialState.FAIL)
+        else:
+            pool.shutdown()
+        for worker in workers:
+            worker.close()
+        bar.close()
+        if progress is not None:
+            progress.close()
+
+
 def main():
     parser = argparse.ArgumentParser(description="Optuna hyperparameter optimization for Evolvion")
     parser.add_argument("--n-trials", type=int, default=100, help="Number of trials to run")
     parser.add_argument("--storage", type=str, default="sqlite:///optuna_evolvion.db",
-                      help="Optuna storage URL (e.g., sqlite:///optuna.db)")
+                      help="Optuna storage URL (e.g., sqlite:///optuna.db or postgresql+psycopg://user:pw@host/db)")
     parser.add_argument("--study-name", type=str, default="evolvion_sweep_v1",
                       help="Name of the Optuna study")
     parser.add_argument("--n-jobs", type=int, default=1,
-                      help="Number of parallel jobs (use with caution - high CPU usage)")
+                      help="Number of parallel worker processes (use with caution - high CPU usage)")
+    parser.add_argument("--batch-size", type=int, default=1,
+                      help="Trials sampled and evaluated concurrently per worker process")
+    parser.add_argument("--warm-start", type=str, action="append", default=[], metavar="FILE",
+                      help="Enqueue hyperparameters from FILE as the first trials: the best set from "
+                           "optuna_best_params.txt, or the top 5 rows of optuna_top_trials.txt; repeatable")
+    parser.add_argument("--publish-dir", type=str, default="_pub",
+                      help="Where the evaluator is published and run from")
+    parser.add_argument("--no-publish", action="store_true",
+                      help="Reuse the evaluator already in --publish-dir instead of publishing it again")
+    parser.add_argument("--no-pin-cpus", dest="pin_cpus", action="store_false",
+                      help="Let parallel workers share all CPUs instead of pinning each to its own block")
+    parser.add_argument("--progress-file", type=str, default="optuna_progress.jsonl",
+                      help="Append one JSON line per finished trial here (empty string disables)")
+    parser.add_argument("--max-population", type=int, default=None,
+                      help="Cap species_count x individuals_per_species by narrowing their sampling ranges")
+    parser.add_argument("--n-startup-trials", type=int, default=None,
+                      help="Random trials before TPE kicks in (default: 20, or 5 with --warm-start)")
+    # Internal: set by the launcher when spawning worker processes
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--worker-id", type=int, default=0, help=argparse.SUPPRESS)
+    parser.add_argument("--worker-trials", type=int, default=None, help=argparse.SUPPRESS)
     args = parser.parse_args()
 
+    if args.max_population is not None and args.max_population < MIN_POPULATION:
+        print(f"ERROR: --max-population must be at least {MIN_POPULATION} (smallest population in the search space)")
+        sys.exit(1)
+
+    if args.n_startup_trials is None:
+        # Known-good trials already give TPE an informed prior, so little random exploration is needed
+        args.n_startup_trials = 5 if args.warm_start else 20
+
+    if args.worker:
+        # The launcher stops workers with terminate(); unwind so run_worker can clean up
+        signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(1))
+        run_worker(args)
+        return
+
+    # Build the evaluator once; workers run the published assembly directly
+    publish_dir = Path(args.publish_dir)
+    if args.no_publish:
+        if not (publish_dir / EVALUATOR_DLL).exists():
+            print(f"ERROR: --no-publish given but {publish_dir / EVALUATOR_DLL} does not exist")
+            sys.exit(1)
+    else:
+        print(f"Publishing {PROJECT} to {publish_dir}...")
+        subprocess.run(
+            ["dotnet", "publish", PROJECT, "-c", "Release", "--no-self-contained",
+             "-o", str(publish_dir), "--nologo"],
+            check=True
+        )
+
     # Create or load study
     study = optuna.create_study(
         study_name=args.study_name,
-        storage=args.storage,
+        storage=create_storage(args.storage),
         load_if_exists=True,
         direction="maximize",  # Maximize fitness (less negative MSE = better)
-        sampler=optuna.samplers.TPESampler(seed=42, n_startup_trials=20)
+        sampler=create_sampler(42, args.n_startup_trials),
+        pruner=create_pruner()
     )
 
+    for path in args.warm_start:
+        try:
+            param_sets = load_params_file(path)
+        except ValueError as e:
+            print(f"ERROR: --warm-start {e}")
+            sys.exit(1)
+        for params in param_sets:
+            study.enqueue_trial(params, skip_if_exists=True)
+        print(f"Enqueued {len(param_sets)} warm-start parameter set(s) from {path}")
+
     print(f"Starting Optuna optimization:")
     print(f"  Study: {args.study_name}")
     print(f"  Storage: {args.storage}")
     print(f"  Trials: {args.n_trials}")
     print(f"  Parallel jobs: {args.n_jobs}")
+    print(f"  Batch size: {args.batch_size}")
+    if args.storage.startswith("sqlite") and args.n_jobs > 1:
+        print("  Note: SQLite serializes writes across workers; prefer postgresql:// for large --n-jobs")
     print()
 
-    # Run optimization
-    study.optimize(
-        objective,
-        n_trials=args.n_trials,
-        n_jobs=args.n_jobs,
-        show_progress_bar=True
-    )
+    # Run optimization: in-process for a single job, otherwise one Python process per job
+    if args.n_jobs == 1:
+        args.worker_trials = args.n_trials
+        run_worker(args)
+    else:
+        worker_args = [
+            "--n-jobs", str(args.n_jobs),
+            "--storage", args.storage,
+            "--study-name", args.study_name,
+            "--publish-dir", args.publish_dir,
+            "--progress-file", args.progress_file,
+            "--batch-size", str(args.batch_size),
+            "--n-startup-trials", str(args.n_startup_trials),
+        ]
+        if args.max_population is not None:
+            worker_args += ["--max-population", str(args.max_population)]
+        if not args.pin_cpus:
+            worker_args.append("--no-pin-cpus")
+
+        # Fixed per-worker shares of --n-trials: a worker can't see trials the others are
+        # still running, so sharing one study-wide count would overshoot by up to a batch each
+        shares = [args.n_trials // args.n_jobs + (worker_id < args.n_trials % args.n_jobs)
+                  for worker_id in range(args.n_jobs)]
+        procs = [
+            subprocess.Popen([sys.executable, __file__, "--worker", "--worker-id", str(worker_id),
+                              "--worker-trials", str(share)] + worker_args)
+            for worker_id, share in enumerate(shares)
+            if share > 0
+        ]
+        try:
+            returncodes = [proc.wait() for proc in procs]
+        except KeyboardInterrupt:
+            for proc in procs:
+                proc.terminate()
+            # Let each worker fail its in-flight trials and exit before we do
+            for proc in procs:
+                proc.wait()
+            raise
+
+        # Workers are spawned in id order, so list position is the worker id
+        failed = [worker_id for worker_id, returncode in enumerate(returncodes) if returncode != 0]
+        if failed:
+            print(f"ERROR: worker(s) {', '.join(map(str, failed))} exited with an error - see output above")
+            sys.exit(1)
 
     # Print results
     print("\n" + "="*80)
     print("OPTIMIZATION COMPLETE")
     print("="*80)
 
-    print(f"\nBest trial: {study.best_trial.number}")
-    print(f"Best fitness: {study.best_value:.6f}")
+    # One bulk fetch serves both the best trial and the top-10 table
+    completed = study.get_trials(deepcopy=False, states=(TrialState.COMPLETE,))
+    top_trials = nlargest(10, completed, key=attrgetter("value"))
+    if not top_trials:
+        print("\nNo completed trials - nothing to report.")
+        return
+    best = top_trials[0]
+
+    print(f"\nBest trial: {best.number}")
+    print(f"Best fitness: {best.value:.6f}")
     print("\nBest hyperparameters:")
-    for key, value in study.best_params.items():
+    for key, value in best.params.items():
         print(f"  {key}: {value}")
 
     # Save results to file
     results_file = Path("optuna_best_params.txt")
     with open(results_file, "w") as f:
-        f.write(f"Best trial: {study.best_trial.number}\n")
-        f.write(f"Best fitness: {study.best_value:.6f}\n\n")
+        f.write(f"Best trial: {best.number}\n")
+        f.write(f"Best fitness: {best.value:.6f}\n\n")
         f.write("Best hyperparameters:\n")
-        for key, value in study.best_params.items():
+        for key, value in best.params.items():
             f.write(f"{key}={value}\n")
 
+    # Tab-separated top 10; conditional params a trial didn't sample are left blank
+    top_file = Path("optuna_top_trials.txt")
+    param_names = sorted({name for trial in top_trials for name in trial.params})
+    with open(top_file, "w") as f:
+        f.write("\t".join(["trial", "fitness"] + param_names) + "\n")
+        for trial in top_trials:
+            row = [str(trial.number), f"{trial.value:.6f}"]
+            row += [str(trial.params.get(name, "")) for name in param_names]
+            f.write("\t".join(row) + "\n")
+
     print(f"\nResults saved to: {results_file}")
+    print(f"Top {len(top_trials)} trials saved to: {top_file}")
     print(f"Study database: {args.storage}")
     print("\nView results interactively:")
     print(f"  optuna-dashboard {args.storage}")